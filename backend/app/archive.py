@@ -0,0 +1,32 @@
+import argparse
+import os
+
+from .database import SessionLocal, engine
+from .models import create_schema
+from .services.archive_service import SubscriptionArchiveService
+from .services.subscription_service import SubscriptionService
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+# Usage: python -m app.archive [--older-than-days N] [--batch-size N]
+def main():
+    parser = argparse.ArgumentParser(description="Move cancelled and expired subscriptions that ended long ago to subscription_history")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    create_schema(engine)
+
+    db = SessionLocal()
+    try:
+        # Active rows past their end date must become EXPIRED before they can be archived
+        expired = SubscriptionService(db).expire_due(args.batch_size)
+        archived = SubscriptionArchiveService(db).archive(args.older_than_days, args.batch_size)
+    finally:
+        db.close()
+    print(f"Expired {expired} subscriptions")
+    print(f"Archived {archived} subscriptions")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from functools import lru_cache
+from typing import Optional
 from sqlalchemy.orm import Session
 from .database import get_db
 from .models import User
@@ -33,6 +34,19 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_token(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+def decode_user_id(token: str) -> Optional[int]:
+    payload = decode_token(token) or {}
+    try:
+        return int(payload["sub"]) if payload.get("sub") else None
+    except ValueError:
+        return None
+
 @lru_cache(maxsize=5000)
 def get_user_by_id_cached(user_id: int, db: Session):
     return db.query(User).filter(User.id == user_id).first()
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, Dict, Optional, Set
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "64"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+class _Subscriber:
+    __slots__ = ("queue", "user_id", "expires_at")
+
+    def __init__(self, user_id: Optional[int], expires_at: Optional[float]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.user_id = user_id
+        self.expires_at = expires_at
+
+class EventBroker:
+    """Fans out server-sent events to connected clients.
+
+    `publish` may be called from threadpool routes; delivery always happens on
+    the event loop. Every client has a bounded queue and is disconnected when
+    it falls behind. A single broker-wide task sends heartbeats and ends
+    streams whose token has expired, so an idle connection costs only its
+    queue and the suspended stream.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[_Subscriber] = set()
+        # User-targeted events go straight to that user's streams
+        self._by_user: Dict[int, Set[_Subscriber]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    def publish(self, event: str, data: dict, user_id: Optional[int] = None):
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        # Serialized once, shared by every recipient
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        loop.call_soon_threadsafe(self._dispatch, message, user_id)
+
+    def _dispatch(self, message: str, user_id: Optional[int]):
+        if user_id is None:
+            recipients = self._subscribers
+        else:
+            recipients = self._by_user.get(user_id, ())
+        for subscriber in list(recipients):
+            self._offer(subscriber, message)
+
+    def _offer(self, subscriber: _Subscriber, message: str):
+        try:
+            subscriber.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._close(subscriber)
+
+    def _add(self, subscriber: _Subscriber):
+        self._subscribers.add(subscriber)
+        if subscriber.user_id is not None:
+            self._by_user.setdefault(subscriber.user_id, set()).add(subscriber)
+
+    def _remove(self, subscriber: _Subscriber):
+        self._subscribers.discard(subscriber)
+        if subscriber.user_id is not None:
+            user_subscribers = self._by_user.get(subscriber.user_id)
+            if user_subscribers is not None:
+                user_subscribers.discard(subscriber)
+                if not user_subscribers:
+                    del self._by_user[subscriber.user_id]
+
+    def _close(self, subscriber: _Subscriber):
+        self._remove(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    async def _send_heartbeats(self):
+        while self._subscribers:
+            await asyncio.sleep(EVENTS_HEARTBEAT_SECONDS)
+            now = time.time()
+            for subscriber in list(self._subscribers):
+                if subscriber.expires_at is not None and subscriber.expires_at <= now:
+                    self._close(subscriber)
+                else:
+                    self._offer(subscriber, ": ping\n\n")
+        self._heartbeat = None
+
+    async def stream(self, user_id: Optional[int], expires_at: Optional[float] = None) -> AsyncIterator[str]:
+        self._loop = asyncio.get_running_loop()
+        subscriber = _Subscriber(user_id, expires_at)
+        self._add(subscriber)
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._send_heartbeats())
+
+        try:
+            yield ": connected\n\n"
+            while True:
+                message = await subscriber.queue.get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            self._remove(subscriber)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+broker = EventBroker()
@@ -1,8 +1,20 @@
+import asyncio
+import logging
 import os
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routers import users, publications, subscriptions
+from .database import SessionLocal, engine
+from .models import create_schema
+from .rate_limit import RateLimitMiddleware
+from .routers import users, publications, subscriptions, events
+from .services.publication_service import publication_reads
+from .services.subscription_service import SubscriptionService
+
+EXPIRY_SWEEP_SECONDS = float(os.getenv("EXPIRY_SWEEP_SECONDS", "60"))
+EXPIRY_BATCH_SIZE = int(os.getenv("EXPIRY_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Subscription Management API",
@@ -17,6 +29,9 @@ origins = [
     "http://localhost:80"
 ]
 
+# Rate limiting (added before CORS so that 429 responses still carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,13 +41,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables and indexes
+create_schema(engine)
 
 # Include routers
 app.include_router(users.router)
 app.include_router(publications.router)
 app.include_router(subscriptions.router)
+app.include_router(events.router)
+
+def expire_due_subscriptions() -> int:
+    db = SessionLocal()
+    try:
+        return SubscriptionService(db).expire_due(EXPIRY_BATCH_SIZE)
+    finally:
+        db.close()
+
+# Expiring in the web process lets subscription.expired reach this worker's event streams
+async def sweep_expired_subscriptions():
+    while True:
+        try:
+            await run_in_threadpool(expire_due_subscriptions)
+        except Exception:
+            logger.exception("Subscription expiry sweep failed")
+        await asyncio.sleep(EXPIRY_SWEEP_SECONDS)
+
+@app.on_event("startup")
+async def start_expiry_sweep():
+    app.state.expiry_sweep = asyncio.create_task(sweep_expired_subscriptions())
+
+@app.on_event("shutdown")
+async def stop_expiry_sweep():
+    app.state.expiry_sweep.cancel()
 
 @app.get("/")
 def root():
@@ -45,3 +85,7 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics")
+def metrics():
+    return {"singleflight": {publication_reads.name: publication_reads.stats()}}
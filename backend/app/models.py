@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Float, DateTime, ForeignKey, Enum, Boolean, Text
+from sqlalchemy import Column, BigInteger, String, Float, DateTime, ForeignKey, Enum, Boolean, Text, Index, func, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -28,7 +28,7 @@ class User(Base):
     full_name = Column(String)
     role = Column(Enum(UserRole), default=UserRole.USER, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     subscriptions = relationship("Subscription", back_populates="user")
 
@@ -46,7 +46,7 @@ class Publication(Base):
     cover_image_url = Column(String)
     is_visible = Column(Boolean, default=True, nullable=False)
     is_available = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     subscriptions = relationship("Subscription", back_populates="publication")
 
@@ -61,7 +61,45 @@ class Subscription(Base):
     status = Column(Enum(SubscriptionStatus), default=SubscriptionStatus.ACTIVE, nullable=False)
     price = Column(Float, nullable=False)
     auto_renew = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     user = relationship("User", back_populates="subscriptions")
     publication = relationship("Publication", back_populates="subscriptions")
+
+    __table_args__ = (
+        # Partial indexes keep lookups on live rows independent of how many dead rows accumulate
+        Index("ix_subscriptions_active_user_publication", "user_id", "publication_id",
+              postgresql_where=text("status = 'ACTIVE'")),
+        Index("ix_subscriptions_active_end_date", "end_date",
+              postgresql_where=text("status = 'ACTIVE'")),
+        Index("ix_subscriptions_inactive_end_date", "end_date",
+              postgresql_where=text("status <> 'ACTIVE'")),
+        Index("ix_subscriptions_user_created_at", "user_id", "created_at"),
+    )
+
+# Cancelled and expired subscriptions moved out of `subscriptions` by the archiver (app/archive.py)
+class SubscriptionHistory(Base):
+    __tablename__ = "subscription_history"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)  # id of the original subscription
+    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+    publication_id = Column(BigInteger, ForeignKey("publications.id"), nullable=False)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    status = Column(Enum(SubscriptionStatus), nullable=False)
+    price = Column(Float, nullable=False)
+    auto_renew = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    publication = relationship("Publication")
+
+    __table_args__ = (
+        Index("ix_subscription_history_user_created_at", "user_id", "created_at"),
+    )
+
+def create_schema(engine):
+    Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, including their new indexes
+    for index in Subscription.__table__.indexes | SubscriptionHistory.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
@@ -0,0 +1,181 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from .auth import decode_user_id
+
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "1000000"))
+RATE_LIMIT_REDIS_TIMEOUT_SECONDS = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT_SECONDS", "0.25"))
+
+logger = logging.getLogger(__name__)
+
+class Budget(NamedTuple):
+    capacity: int
+    per_seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+class RouteLimit(NamedTuple):
+    ip: Optional[Budget] = None
+    user: Optional[Budget] = None
+
+# bcrypt-backed routes get tight budgets; everything else shares a generous default
+ROUTE_LIMITS: Dict[Tuple[str, str], RouteLimit] = {
+    ("POST", "/api/users/login"): RouteLimit(ip=Budget(10, 60)),
+    ("POST", "/api/users/register"): RouteLimit(ip=Budget(5, 600)),
+    ("POST", "/api/users/me/password"): RouteLimit(ip=Budget(10, 600), user=Budget(5, 600)),
+}
+DEFAULT_LIMIT = RouteLimit(ip=Budget(300, 60), user=Budget(300, 60))
+
+class MemoryBucketStore:
+    """Token buckets kept as (tokens, updated_at, full_at) tuples in LRU order.
+
+    Buckets are refilled lazily on access. A bucket past `full_at` is
+    indistinguishable from a missing one, so idle keys are dropped from the
+    cold end as new ones arrive, and the store never exceeds `max_keys`.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, budget: Budget) -> float:
+        return self.take_now(key, budget, time.monotonic())
+
+    def take_now(self, key: str, budget: Budget, now: float) -> float:
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (budget.capacity, now, now))
+            tokens = min(budget.capacity, tokens + (now - updated_at) * budget.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / budget.rate
+            self._buckets[key] = (tokens, now, now + (budget.capacity - tokens) / budget.rate)
+            self._evict(now)
+            return wait
+
+    def _evict(self, now: float):
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+_REDIS_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+class RedisBucketStore:
+    """Shared bucket store for multi-worker deployments (requires the `redis` package).
+
+    While Redis is unreachable or slow, buckets fall back to a per-worker
+    MemoryBucketStore so limiting degrades instead of failing every request.
+    """
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as aioredis
+            from redis.exceptions import RedisError
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed")
+        self._redis = aioredis.from_url(
+            url,
+            socket_timeout=RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+        )
+        self._take = self._redis.register_script(_REDIS_TAKE_SCRIPT)
+        self._errors = RedisError
+        self._fallback = MemoryBucketStore()
+        self._degraded = False
+
+    async def take(self, key: str, budget: Budget) -> float:
+        try:
+            wait = await self._take(keys=[f"ratelimit:{key}"], args=[budget.capacity, budget.rate, time.time()])
+        except self._errors:
+            if not self._degraded:
+                self._degraded = True
+                logger.warning("Rate limit store unavailable, using per-worker buckets", exc_info=True)
+            return await self._fallback.take(key, budget)
+
+        if self._degraded:
+            self._degraded = False
+            logger.warning("Rate limit store recovered")
+        return float(wait)
+
+def build_store():
+    if RATE_LIMIT_REDIS_URL:
+        return RedisBucketStore(RATE_LIMIT_REDIS_URL)
+    return MemoryBucketStore()
+
+class RateLimitMiddleware:
+    def __init__(self, app, store=None):
+        self.app = app
+        self.store = store or build_store()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = (scope["method"], scope["path"])
+        limit = ROUTE_LIMITS.get(route)
+        # Routes without their own budget share one bucket per client
+        bucket = f"{route[0]}:{route[1]}" if limit else "*"
+        limit = limit or DEFAULT_LIMIT
+        headers = Headers(scope=scope)
+
+        wait = 0.0
+        if limit.ip:
+            client_ip = headers.get("x-real-ip") or (scope.get("client") or ("unknown",))[0]
+            wait = await self.store.take(f"ip:{client_ip}:{bucket}", limit.ip)
+        if not wait and limit.user:
+            user_id = self._user_id(headers)
+            if user_id is not None:
+                wait = await self.store.take(f"user:{user_id}:{bucket}", limit.user)
+
+        if wait:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests"},
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _user_id(self, headers: Headers) -> Optional[int]:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return decode_user_id(token)
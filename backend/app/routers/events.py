@@ -0,0 +1,58 @@
+import logging
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from ..auth import decode_user_id, decode_token
+from ..database import SessionLocal
+from ..events import broker
+from ..models import User
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+class _RedactQueryFilter(logging.Filter):
+    # uvicorn.access args are (client_addr, method, full_path, http_version, status_code)
+    def filter(self, record: logging.LogRecord) -> bool:
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3 and str(args[2]).startswith(router.prefix):
+            record.args = args[:2] + (str(args[2]).split("?", 1)[0],) + args[3:]
+        return True
+
+logging.getLogger("uvicorn.access").addFilter(_RedactQueryFilter())
+
+def _is_active_user(user_id: int) -> bool:
+    # A short-lived session: holding one per open stream would exhaust the pool
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.id == user_id, User.is_active == True).first() is not None
+    finally:
+        db.close()
+
+@router.get("")
+async def stream_events(
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    # EventSource cannot set headers, so the token may also come as ?token=
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+
+    user_id = None
+    expires_at = None
+    if token:
+        user_id = decode_user_id(token)
+        if user_id is None or not await run_in_threadpool(_is_active_user, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        # The stream is closed once the token it was opened with expires
+        expires_at = decode_token(token).get("exp")
+
+    return StreamingResponse(
+        broker.stream(user_id, expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
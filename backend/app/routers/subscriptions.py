@@ -23,10 +23,11 @@ def create_subscription(
 
 @router.get("/my", response_model=List[SubscriptionResponse])
 def get_my_subscriptions(
+    include_history: bool = False,
     current_user: User = Depends(get_current_user),
     service: SubscriptionService = Depends(get_subscription_service)
 ):
-    return service.get_my_subscriptions(current_user)
+    return service.get_my_subscriptions(current_user, include_history)
 
 @router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_subscription(
@@ -0,0 +1,40 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+
+from ..models import Subscription, SubscriptionHistory, SubscriptionStatus
+
+ARCHIVED_COLUMNS = [
+    "id", "user_id", "publication_id", "start_date", "end_date",
+    "status", "price", "auto_renew", "created_at",
+]
+
+class SubscriptionArchiveService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def archive(self, older_than_days: int, batch_size: int) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        archived = 0
+
+        while True:
+            ids = [row.id for row in self.db.query(Subscription.id).filter(
+                Subscription.status != SubscriptionStatus.ACTIVE,
+                Subscription.end_date < cutoff
+            ).order_by(Subscription.end_date).limit(batch_size)]
+
+            if not ids:
+                break
+
+            # Copy and delete in one transaction per chunk so a failed run never loses rows
+            self.db.execute(
+                insert(SubscriptionHistory).from_select(
+                    ARCHIVED_COLUMNS,
+                    select(*[getattr(Subscription, c) for c in ARCHIVED_COLUMNS]).where(Subscription.id.in_(ids))
+                )
+            )
+            self.db.query(Subscription).filter(Subscription.id.in_(ids)).delete(synchronize_session=False)
+            self.db.commit()
+            archived += len(ids)
+
+        return archived
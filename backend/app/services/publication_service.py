@@ -2,8 +2,13 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from fastapi import HTTPException
 
+from ..events import broker
 from ..models import Publication, PublicationType, User, UserRole
 from ..schemas import PublicationCreate, PublicationUpdate, PublicationResponse
+from ..singleflight import SingleFlight
+
+# Concurrent identical catalog reads share one query and its serialized result
+publication_reads = SingleFlight("publications")
 
 class PublicationService:
     def __init__(self, db: Session):
@@ -25,14 +30,26 @@ class PublicationService:
         publication = Publication(**cleaned_data)
         self.db.add(publication)
         self.db.commit()
+        publication_reads.invalidate()
         self.db.refresh(publication)
-        return PublicationResponse.model_validate(publication)
+        response = PublicationResponse.model_validate(publication)
+        broker.publish("publication.created", response.model_dump(mode="json"))
+        return response
 
     def get_list(
         self,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
         type_filter: Optional[PublicationType] = None
+    ) -> List[PublicationResponse]:
+        key = ("list", skip, limit, type_filter)
+        return list(publication_reads.do(key, lambda: self._fetch_list(skip, limit, type_filter)))
+
+    def _fetch_list(
+        self,
+        skip: Optional[int],
+        limit: Optional[int],
+        type_filter: Optional[PublicationType]
     ) -> List[PublicationResponse]:
         query = self.db.query(Publication).filter(
             Publication.is_available == True,
@@ -59,13 +76,20 @@ class PublicationService:
         return [PublicationResponse.model_validate(pub) for pub in publications]
 
     def get_by_id(self, publication_id: int, current_user: Optional[User] = None) -> PublicationResponse:
-        publication = self.db.query(Publication).filter(Publication.id == publication_id).first()
-        if not publication or not publication.is_available:
+        # The shared result is user-independent; visibility is checked per caller
+        publication = publication_reads.do(("id", publication_id), lambda: self._fetch_by_id(publication_id))
+        if not publication:
             raise HTTPException(status_code=404, detail="Publication not found")
 
         if not publication.is_visible and (not current_user or current_user.role != UserRole.ADMIN):
             raise HTTPException(status_code=404, detail="Publication not found")
 
+        return publication
+
+    def _fetch_by_id(self, publication_id: int) -> Optional[PublicationResponse]:
+        publication = self.db.query(Publication).filter(Publication.id == publication_id).first()
+        if not publication or not publication.is_available:
+            return None
         return PublicationResponse.model_validate(publication)
 
     def update(self, publication_id: int, data: PublicationUpdate, current_user: User) -> PublicationResponse:
@@ -83,8 +107,15 @@ class PublicationService:
             setattr(publication, key, value)
 
         self.db.commit()
+        publication_reads.invalidate()
         self.db.refresh(publication)
-        return PublicationResponse.model_validate(publication)
+        response = PublicationResponse.model_validate(publication)
+        # Hidden publications must not leak to the public stream
+        if response.is_visible and response.is_available:
+            broker.publish("publication.updated", response.model_dump(mode="json"))
+        else:
+            broker.publish("publication.removed", {"id": response.id})
+        return response
 
     def soft_delete(self, publication_id: int, current_user: User) -> None:
         if current_user.role != UserRole.ADMIN:
@@ -99,3 +130,5 @@ class PublicationService:
         publication.is_visible = False
         publication.is_available = False
         self.db.commit()
+        publication_reads.invalidate()
+        broker.publish("publication.removed", {"id": publication_id})
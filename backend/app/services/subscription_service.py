@@ -1,9 +1,11 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
 
-from ..models import Subscription, Publication, User, SubscriptionStatus
+from ..events import broker
+from ..models import Subscription, SubscriptionHistory, Publication, User, SubscriptionStatus
 from ..schemas import SubscriptionCreate, SubscriptionResponse
 
 class SubscriptionService:
@@ -56,13 +58,21 @@ class SubscriptionService:
         self.db.add(subscription)
         self.db.commit()
         self.db.refresh(subscription)
-        return SubscriptionResponse.model_validate(subscription)
+        response = SubscriptionResponse.model_validate(subscription)
+        broker.publish("subscription.created", response.model_dump(mode="json"), user_id=current_user.id)
+        return response
 
-    def get_my_subscriptions(self, current_user: User) -> List[SubscriptionResponse]:
+    def get_my_subscriptions(self, current_user: User, include_history: bool = False) -> List[SubscriptionResponse]:
         subscriptions = self.db.query(Subscription).filter(
             Subscription.user_id == current_user.id
         ).order_by(Subscription.created_at.desc()).all()
 
+        if include_history:
+            archived = self.db.query(SubscriptionHistory).filter(
+                SubscriptionHistory.user_id == current_user.id
+            ).order_by(SubscriptionHistory.created_at.desc()).all()
+            subscriptions = sorted(subscriptions + archived, key=lambda sub: sub.created_at, reverse=True)
+
         return [SubscriptionResponse.model_validate(sub) for sub in subscriptions]
 
     def cancel(self, subscription_id: int, current_user: User) -> None:
@@ -83,3 +93,39 @@ class SubscriptionService:
         subscription.status = SubscriptionStatus.CANCELLED
         subscription.auto_renew = False
         self.db.commit()
+        broker.publish(
+            "subscription.cancelled",
+            {"id": subscription_id, "status": SubscriptionStatus.CANCELLED.value},
+            user_id=current_user.id
+        )
+
+    def expire_due(self, batch_size: int) -> int:
+        expired = 0
+        while True:
+            ids = [row.id for row in self.db.query(Subscription.id).filter(
+                Subscription.status == SubscriptionStatus.ACTIVE,
+                Subscription.end_date < datetime.now(timezone.utc)
+            ).order_by(Subscription.end_date).limit(batch_size)]
+
+            if not ids:
+                break
+
+            # Re-check the status so concurrent sweeps never report the same row twice
+            rows = self.db.execute(
+                update(Subscription)
+                .where(Subscription.id.in_(ids), Subscription.status == SubscriptionStatus.ACTIVE)
+                .values(status=SubscriptionStatus.EXPIRED)
+                .returning(Subscription.id, Subscription.user_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            self.db.commit()
+            expired += len(rows)
+
+            for row in rows:
+                broker.publish(
+                    "subscription.expired",
+                    {"id": row.id, "status": SubscriptionStatus.EXPIRED.value},
+                    user_id=row.user_id
+                )
+
+        return expired
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, NoReturn, Optional
+
+from fastapi import HTTPException
+
+SINGLEFLIGHT_TIMEOUT_SECONDS = float(os.getenv("SINGLEFLIGHT_TIMEOUT_SECONDS", "5"))
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Shares one in-flight execution between concurrent callers with the same key.
+
+    `do` serves threadpool routes and `do_async` serves async routes. Followers
+    wait at most `timeout` seconds for the leader and then fail fast with 503
+    rather than each hitting the database themselves. Writers
+    call `invalidate` after committing so later readers never join a query
+    that started before the write.
+    """
+
+    def __init__(self, name: str, timeout: float = SINGLEFLIGHT_TIMEOUT_SECONDS):
+        self.name = name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+        self._leaders = 0
+        self._coalesced = 0
+        self._timeouts = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            key = (self._generation, key)
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as exc:
+                call.error = exc
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if not call.done.wait(self.timeout):
+            self._timed_out()
+        with self._lock:
+            self._coalesced += 1
+        if call.error is not None:
+            self._reraise(call.error)
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            key = (self._generation, key)
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                # The flight runs in its own task so a cancelled leader cannot cancel it for followers
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda done: self._finish_task(key, done))
+                self._leaders += 1
+
+        if leader:
+            return await asyncio.shield(task)
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out()
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            # Only the flight itself was cancelled; this request carries on alone
+            return await fn()
+        except Exception as exc:
+            with self._lock:
+                self._coalesced += 1
+            self._reraise(exc)
+        with self._lock:
+            self._coalesced += 1
+        return result
+
+    def _finish_task(self, key: Hashable, task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        # Mark the error as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def _timed_out(self) -> NoReturn:
+        with self._lock:
+            self._timeouts += 1
+        raise HTTPException(status_code=503, detail="Service is busy, try again", headers={"Retry-After": "1"})
+
+    def _reraise(self, error: BaseException) -> NoReturn:
+        # Raising the leader's instance in every follower would keep growing its shared traceback
+        if isinstance(error, HTTPException):
+            raise HTTPException(status_code=error.status_code, detail=error.detail, headers=error.headers) from error
+        raise RuntimeError(f"Shared {self.name} call failed") from error
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "timeouts": self._timeouts,
+                "in_flight": len(self._calls) + len(self._tasks),
+            }